@@ -39,6 +39,11 @@ BEGIN
         RAISE EXCEPTION 'Client with ID % not found.', clientId;
     END IF;
 
+    IF update_record.c_balance + transactionValue <= -update_record.c_limit THEN
+        RAISE EXCEPTION 'Transaction would exceed the limit of client %.', clientId
+            USING ERRCODE = '23514';
+    END IF;
+
     UPDATE clients
     SET c_balance = c_balance + transactionValue 
     WHERE id = clientId
@@ -49,6 +54,37 @@ END;
     $$ LANGUAGE plpgsql;
 
 
+-- Function to build the full statement response in a single round-trip
+CREATE OR REPLACE FUNCTION getClientStatement(clientId SMALLINT)
+    RETURNS JSON AS $$
+    SELECT json_build_object(
+        'saldo', json_build_object(
+            'total', c.c_balance,
+            'data_extrato', now(),
+            'limite', c.c_limit
+        ),
+        'ultimas_transacoes',
+        -- id breaks created_at ties: batched inserts share one statement
+        -- timestamp, and the sequence preserves arrival order.
+        COALESCE((SELECT json_agg(json_build_object(
+                      'valor', t.valor,
+                      'tipo', t.tipo,
+                      'descricao', t.descricao,
+                      'realizada_em', t.realizada_em
+                  ) ORDER BY t.realizada_em DESC, t.id DESC)
+                  FROM (SELECT id, t_value AS valor, t_type AS tipo,
+                               t_description AS descricao,
+                               created_at AS realizada_em
+                        FROM transactions
+                        WHERE client_id = clientId
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT 10) t), '[]'::json)
+    )
+    FROM clients c
+    WHERE c.id = clientId;
+    $$ LANGUAGE sql;
+
+
 -- Initial clients insertion
 DO $$
 BEGIN
@@ -6,3 +6,7 @@ DB_NAME = os.getenv("DB_NAME")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT", "5432")  # Default to 5432
 POOL_SIZE = os.getenv("POOL_SIZE")
+REPLICAS = os.getenv("REPLICAS", "1")  # total app processes sharing the DB
+# Coalescing window for concurrent writes to the same client, in
+# milliseconds; 0 disables batching.
+BATCH_WINDOW_MS = os.getenv("BATCH_WINDOW_MS", "0")
@@ -1,6 +1,136 @@
+import asyncio
+import logging
+
 import asyncpg
+import orjson
+
+from .config import BATCH_WINDOW_MS, REPLICAS
+
+logger = logging.getLogger(__name__)
+
+
+SAVE_TRANSACTION_SQL = (
+    'WITH balance AS (SELECT * FROM updateClientBalance($1, $2)), '
+    'ins AS ('
+    '    INSERT INTO transactions (client_id, t_value, t_type, t_description) '
+    '    VALUES ($1, $3, $4, $5)'
+    ') '
+    'SELECT new_balance FROM balance'
+)
+
+LIMITS_SQL = 'SELECT id, c_limit FROM clients'
+
+# The ::text cast keeps the server-built JSON as a plain string, so it can
+# be sent back to the client without being decoded and re-encoded here.
+STATEMENT_SQL = 'SELECT getClientStatement($1)::text'
+
+
+class TransactionBatcher:
+    """Coalesces concurrent writes to the same client into one statement.
+
+    Calls arriving within the window are flushed together as a single
+    updateClientBalance with the summed delta plus a multi-row INSERT.
+    Each caller gets the balance it would have seen had the writes run
+    sequentially. If the summed update violates the limit, or an
+    intermediate balance cannot be proven safe from the sum alone, the
+    batch falls back to the single-statement path so only the offending
+    transactions fail.
+    """
+
+    MAX_BATCH = 32
+
+    def __init__(self, db, window_ms: float):
+        self._db = db
+        self._window = window_ms / 1000
+        self._pending = {}  # client_id -> list[(future, t_value, data)]
+        self._sql_cache = {}  # batch size -> SQL text
+        # Strong references to in-flight delayed flushes: the loop only
+        # keeps weak ones, and a collected task would strand its futures.
+        self._flush_tasks = set()
+
+    async def save_transaction(self, client_id: int, t_value: int, data: dict):
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(client_id, [])
+        batch.append((future, t_value, data))
+        if len(batch) >= self.MAX_BATCH:
+            del self._pending[client_id]
+            await self._flush(client_id, batch)
+        elif len(batch) == 1:
+            task = asyncio.create_task(self._delayed_flush(client_id))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        return await future
+
+    async def _delayed_flush(self, client_id: int):
+        await asyncio.sleep(self._window)
+        batch = self._pending.pop(client_id, None)
+        if batch:
+            await self._flush(client_id, batch)
 
-from .model import TransactionRequest
+    async def _flush(self, client_id: int, batch: list):
+        total = sum(t_value for _, t_value, _ in batch)
+        # The summed update only proves the *final* balance respects the
+        # limit; an intermediate balance is only provably safe when its
+        # prefix sum is >= 0 (never below the pre-batch balance) or
+        # >= total (never below the checked final balance). Batches where
+        # some prefix dips under both could mask a debit that sequential
+        # execution would reject, so they run through the single-statement
+        # path instead.
+        floor = min(total, 0)
+        prefix = 0
+        for _, t_value, _ in batch:
+            prefix += t_value
+            if prefix < floor:
+                await self._flush_individually(client_id, batch)
+                return
+        args = [client_id, total]
+        for _, _, data in batch:
+            args.extend((data['valor'], data['tipo'], data['descricao']))
+        try:
+            new_balance = await self._db.pool.fetchval(self._batch_sql(len(batch)), *args)
+        except asyncpg.CheckViolationError:
+            await self._flush_individually(client_id, batch)
+            return
+        except Exception as exc:
+            for future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        limit = self._db.limits[client_id]
+        balance = new_balance - total
+        for future, t_value, _ in batch:
+            balance += t_value
+            if not future.done():
+                future.set_result((limit, balance))
+
+    async def _flush_individually(self, client_id: int, batch: list):
+        for future, t_value, data in batch:
+            try:
+                result = await self._db.save_single_transaction(client_id, t_value, data)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def _batch_sql(self, size: int):
+        sql = self._sql_cache.get(size)
+        if sql is None:
+            values = ', '.join(
+                f'($1, ${i}, ${i + 1}, ${i + 2})'
+                for i in range(3, 3 * size + 2, 3)
+            )
+            sql = (
+                'WITH balance AS (SELECT * FROM updateClientBalance($1, $2)), '
+                'ins AS ('
+                '    INSERT INTO transactions (client_id, t_value, t_type, t_description) '
+                f'    VALUES {values}'
+                ') '
+                'SELECT new_balance FROM balance'
+            )
+            self._sql_cache[size] = sql
+        return sql
 
 
 class Database:
@@ -11,6 +141,12 @@ class Database:
         self.db_host = db_host
         self.db_port = db_port
         self.pool_size = pool_size
+        self.pool = None
+        # client_id -> c_limit; limits never change for the fixed rinha
+        # dataset, so they are loaded once at startup.
+        self.limits = {}
+        window_ms = float(BATCH_WINDOW_MS)
+        self._batcher = TransactionBatcher(self, window_ms) if window_ms > 0 else None
 
     async def create_pool(self):
         self.pool = await asyncpg.create_pool(
@@ -19,48 +155,62 @@ class Database:
             database=self.db_name,
             host=self.db_host,
             port=int(self.db_port),
-            max_size=int(self.pool_size)
+            min_size=int(self.pool_size),
+            max_size=int(self.pool_size),
+            command_timeout=5,
+            statement_cache_size=1024,
+            init=self._init_connection
         )
-
-    async def save_transaction(self, req: TransactionRequest, client_id: int, t_value: int):
-        async with self.pool.acquire() as connection:
-            print("Acquired a connection from the pool for SAVE_TRANSACTION")
-            async with connection.transaction():
-                balance_result = await connection.fetchrow(
-                    'SELECT * FROM updateClientBalance($1, $2)',
-                    client_id,
-                    t_value
-                )
-                print(balance_result)
-                print(f"Balance updated: {balance_result['client_limit']}, {balance_result['new_balance']}")
-                await connection.execute(
-                    'INSERT INTO transactions (client_id, t_value, t_type, t_description) '
-                    'VALUES ($1, $2, $3, $4)',
-                    client_id,
-                    req.valor,
-                    req.tipo,
-                    req.descricao
-                )
-                print("after insert")
-                return balance_result['client_limit'], balance_result['new_balance']
-    
-    async def get_client_statement(self, client_id: int):
-        async with self.pool.acquire() as connection:
-            print("Acquired a connection from the pool for GET_CLIENT_STATEMENT")
-            client_info = await connection.fetchrow(
-                'SELECT c_balance, c_limit FROM clients WHERE id = $1',
-                client_id
+        self.limits = {
+            row['id']: row['c_limit']
+            for row in await self.pool.fetch(LIMITS_SQL)
+        }
+        max_connections = int(await self.pool.fetchval('SHOW max_connections'))
+        if int(self.pool_size) * int(REPLICAS) > max_connections * 0.8:
+            logger.warning(
+                "Pool size %s x %s replicas exceeds 80%% of Postgres "
+                "max_connections (%s)",
+                self.pool_size, REPLICAS, max_connections
             )
 
-            transactions = await connection.fetch(
-                'SELECT t_value, t_type, t_description, created_at '
-                'FROM transactions WHERE client_id = $1 '
-                'ORDER BY created_at DESC LIMIT 10',
-                client_id
-            )
+    @staticmethod
+    async def _init_connection(connection):
+        # Decode json/jsonb coming back from Postgres with orjson (C)
+        # instead of the stdlib json module.
+        await connection.set_type_codec(
+            'json',
+            encoder=lambda v: v,
+            decoder=orjson.loads,
+            schema='pg_catalog',
+            format='text'
+        )
+        await connection.set_type_codec(
+            'jsonb',
+            encoder=lambda v: b'\x01' + orjson.dumps(v),
+            decoder=lambda v: orjson.loads(v[1:]),
+            schema='pg_catalog',
+            format='binary'
+        )
+
+    async def save_transaction(self, client_id: int, t_value: int, data: dict):
+        if self._batcher is not None:
+            return await self._batcher.save_transaction(client_id, t_value, data)
+        return await self.save_single_transaction(client_id, t_value, data)
 
-            return client_info, transactions
+    async def save_single_transaction(self, client_id: int, t_value: int, data: dict):
+        balance = await self.pool.fetchval(
+            SAVE_TRANSACTION_SQL,
+            client_id,
+            t_value,
+            data['valor'],
+            data['tipo'],
+            data['descricao']
+        )
+        return self.limits[client_id], balance
+
+    async def get_client_statement(self, client_id: int):
+        return await self.pool.fetchval(STATEMENT_SQL, client_id)
 
     async def close_pool(self):
-        if hasattr(self, 'pool') and self.pool:
+        if self.pool:
             await self.pool.close()
\ No newline at end of file
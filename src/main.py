@@ -1,11 +1,15 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, status
+
+import orjson
+import uvloop
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 
 from .database import Database
-from .model import TransactionRequest
 from .service import create_transaction, retrieve_client_statement
 from .config import DB_USER, DB_PW, DB_NAME, DB_HOST, DB_PORT, POOL_SIZE
 
+uvloop.install()
 
 db = Database(
     DB_USER,
@@ -24,14 +28,27 @@ async def lifespan(app: FastAPI):
     await db.close_pool()
     print("Database connection pool closed")
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
-@app.post("/clientes/{client_id}/transacoes", status_code=status.HTTP_200_OK)
-async def new_transaction(client_id: int, request: TransactionRequest):
-    return await create_transaction(client_id, request, db)
+@app.post("/clientes/{client_id}/transacoes", status_code=status.HTTP_200_OK, response_model=None)
+async def new_transaction(client_id: int, request: Request):
+    try:
+        data = orjson.loads(await request.body())
+        valid = (
+            data['tipo'] in ('c', 'd')
+            and isinstance(data['valor'], int)
+            and not isinstance(data['valor'], bool)  # bool is an int subclass
+            and isinstance(data['descricao'], str)
+            and 1 <= len(data['descricao']) <= 10
+        )
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=422)
+    return await create_transaction(client_id, data, db)
 
 
-@app.get("/clientes/{client_id}/extrato", status_code=status.HTTP_200_OK)
+@app.get("/clientes/{client_id}/extrato", status_code=status.HTTP_200_OK, response_model=None)
 async def get_user_statement(client_id: int):
     return await retrieve_client_statement(client_id, db)
@@ -1,12 +1,11 @@
 from datetime import datetime
 
 from pydantic import BaseModel, Field
-from typing import Literal
 
 
 class TransactionRequest(BaseModel):
     valor: int
-    tipo: Literal['c', 'd']
+    tipo: str
     descricao: str = Field(min_length=1, max_length=10)
 
 
@@ -1,46 +1,31 @@
-from datetime import datetime
+import logging
+
 from asyncpg import CheckViolationError
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from fastapi.responses import ORJSONResponse
 
 from .database import Database
-from .model import CreateTransactionResponse, TransactionRequest
 
+logger = logging.getLogger(__name__)
+
+_SIGN = {'c': 1, 'd': -1}
 
-async def create_transaction(
-        client_id: int,
-        req: TransactionRequest,
-        db: Database
-) -> CreateTransactionResponse:
+
+async def create_transaction(client_id: int, data: dict, db: Database):
+    if client_id not in db.limits:
+        raise HTTPException(status_code=404, detail="Client not found")
     try:
-        t_value = req.valor if req.tipo == 'c' else -req.valor
-        limit, balance = await db.save_transaction(req, client_id, t_value)
-        return {
-            'limite': limit,
-            'saldo': balance
-        }
-    except CheckViolationError:
+        t_value = data['valor'] * _SIGN[data['tipo']]
+        limit, balance = await db.save_transaction(client_id, t_value, data)
+        return ORJSONResponse({'limite': limit, 'saldo': balance})
+    except (CheckViolationError, KeyError):
         raise HTTPException(status_code=422)
-    except Exception as e:
-        print(e)
+    except Exception:
+        logger.exception("Failed to save transaction for client %s", client_id)
 
 
 async def retrieve_client_statement(client_id: int, db: Database):
-    c, ts = await db.get_client_statement(client_id)
-    if not c:
+    statement = await db.get_client_statement(client_id)
+    if statement is None:
         raise HTTPException(status_code=404, detail="Client not found")
-    return {
-        "saldo": {
-            "total": c['c_balance'],
-            "data_extrato": datetime.now(),
-            "limite": c['c_limit']
-        },
-        "ultimas_transacoes": [
-            {
-                "valor": t['t_value'],
-                "tipo": t['t_type'],
-                "descricao": t['t_description'],
-                "realizada_em": t['created_at']
-            }
-            for t in ts
-        ]
-    }
+    return Response(content=statement, media_type="application/json")